@@ -1,9 +1,20 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
+import polars as pl
+import altair as alt
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
 
+# Serialización JSON de figuras con orjson (ruta rápida para arreglos NumPy)
+pio.json.config.default_engine = 'orjson'
+
+# Backend de renderizado para trazas de líneas: 'webgl' (Scattergl) o 'svg' (Scatter)
+RENDER_MODE = 'webgl'
+Scatter = go.Scattergl if RENDER_MODE == 'webgl' else go.Scatter
+
 # Configuración de la página
 st.set_page_config(
     page_title="Dashboard Analítico Universitario",
@@ -16,20 +27,162 @@ st.title("🎓 Dashboard Analítico Universitario")
 st.markdown("### Análisis de Datos de Admisiones, Matrícula y Retención Estudiantil")
 st.markdown("---")
 
+DATA_FILE = 'university_student_data.csv'
+
+# Columnas numéricas a reducir de tipo al cargar los datos
+INT_COLS = [
+    'Year', 'Applications', 'Admitted', 'Enrolled',
+    'Engineering Enrolled', 'Business Enrolled', 'Arts Enrolled', 'Science Enrolled'
+]
+FLOAT_COLS = ['Retention Rate (%)', 'Student Satisfaction (%)']
+TERM_DTYPE = pd.CategoricalDtype(['Fall', 'Spring'])
+
+# Columnas de matrícula por departamento y sus nombres para mostrar
+DEPT_COLS = ['Engineering Enrolled', 'Business Enrolled', 'Arts Enrolled', 'Science Enrolled']
+DEPT_NAMES = ['Ingeniería', 'Negocios', 'Artes', 'Ciencias']
+
 # Cargar datos
 @st.cache_data
 def load_data():
-    df = pd.read_csv('university_student_data.csv')
+    df = pd.read_csv(DATA_FILE)
+    # Enteros con signo para que las diferencias (deltas) no desborden
+    for col in INT_COLS:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    for col in FLOAT_COLS:
+        df[col] = df[col].astype('float32')
+    # Term categórico: las comparaciones se resuelven sobre los códigos enteros
+    df['Term'] = df['Term'].astype(TERM_DTYPE)
     return df
 
+# Máximo de filas enviadas a la tabla de vista detallada
+PREVIEW_ROWS = 1000
+
+# Combinaciones de filtros cuyo CSV de descarga se mantiene en caché
+CSV_CACHE_ENTRIES = 10
+
+# Mapeo de opciones del filtro de período a valores de la columna Term
+TERM_MAP = {
+    "Spring (Primavera)": "Spring",
+    "Fall (Otoño)": "Fall"
+}
+
+# Columnas que se suman al pre-agregar por Año × Período
+SUM_COLS = ['Applications', 'Admitted', 'Enrolled'] + DEPT_COLS
+# Conteo de valores no nulos de cada columna promediada
+COUNT_COLS = {col: f'Registros {col}' for col in FLOAT_COLS}
+
+# Pre-agregación al grano Año × Período: los gráficos re-agregan este marco
+# pequeño en lugar de recorrer los registros originales. La agregación pesada
+# se hace con Polars (LazyFrame, multihilo) sobre el mismo marco de load_data()
+# y se pasa a pandas en la frontera
+@st.cache_data
+def load_year_term_agg():
+    df_agg = (
+        pl.from_pandas(load_data()).lazy()
+        .group_by(['Year', 'Term'])
+        .agg([
+            pl.col(SUM_COLS).sum(),
+            pl.col(FLOAT_COLS).cast(pl.Float64).sum(),
+            *[pl.col(col).count().alias(count_col) for col, count_col in COUNT_COLS.items()]
+        ])
+        .sort(['Year', 'Term'])
+        .collect()
+        .to_pandas()
+    )
+    df_agg['Term'] = df_agg['Term'].astype(TERM_DTYPE)
+    return df_agg
+
+def apply_filters(df, year_lo, year_hi, term):
+    # Año y período en una sola expresión; pandas usa numexpr si está instalado
+    expr = "@year_lo <= Year <= @year_hi"
+    if term is not None:
+        expr += " and Term == @term"
+    return df.query(expr, local_dict={'year_lo': year_lo, 'year_hi': year_hi, 'term': term})
+
+def filter_year_term_agg(year_lo, year_hi, term):
+    return apply_filters(load_year_term_agg(), year_lo, year_hi, term)
+
+def reaggregate(df_agg, by):
+    # Los promedios se recalculan como suma / valores no nulos para no promediar promedios
+    grouped = df_agg.groupby(by, observed=True)[SUM_COLS + FLOAT_COLS + list(COUNT_COLS.values())].sum()
+    for col, count_col in COUNT_COLS.items():
+        grouped[col] = grouped[col] / grouped[count_col]
+    return grouped.reset_index()
+
+# Valor y delta de un KPI formateados con el mismo formato
+def kpi(value, baseline, pct=False, fmt=','):
+    suffix = '%' if pct else ''
+    delta = value - baseline
+    return f"{value:{fmt}}{suffix}", f"{delta:{fmt}}{suffix}"
+
+# Registros filtrados sin memoizar: una copia por combinación de filtros en la
+# caché crecería sin límite y cada acierto volvería a copiar todas las filas
+def filter_data(year_lo, year_hi, term):
+    return apply_filters(load_data(), year_lo, year_hi, term)
+
+# Agregaciones memoizadas por los valores de los filtros
+
+@st.cache_data
+def yearly_agg(year_lo, year_hi, term):
+    df_agg = filter_year_term_agg(year_lo, year_hi, term)
+    return reaggregate(df_agg, 'Year')[[
+        'Year', 'Retention Rate (%)', 'Student Satisfaction (%)',
+        'Enrolled', 'Applications', 'Admitted'
+    ]]
+
+@st.cache_data
+def term_agg(year_lo, year_hi, term):
+    df_agg = filter_year_term_agg(year_lo, year_hi, term)
+    return reaggregate(df_agg, 'Term')[[
+        'Term', 'Retention Rate (%)', 'Student Satisfaction (%)',
+        'Enrolled', 'Applications', 'Admitted'
+    ]]
+
+@st.cache_data
+def dept_summary(year_lo, year_hi, term):
+    # Una sola reducción sobre las cuatro columnas de departamento
+    sums = filter_year_term_agg(year_lo, year_hi, term)[DEPT_COLS].sum()
+    dept_data = pd.DataFrame({
+        'Departamento': DEPT_NAMES,
+        'Total Matriculados': sums.values
+    })
+    dept_data['Porcentaje'] = (dept_data['Total Matriculados'] / dept_data['Total Matriculados'].sum() * 100).round(1)
+    # Porcentaje ya formateado para tablas y textos
+    dept_data['Pct_Display'] = [f"{pct}%" for pct in dept_data['Porcentaje']]
+    return dept_data
+
+@st.cache_data
+def dept_yearly_trend(year_lo, year_hi, term):
+    df_agg = filter_year_term_agg(year_lo, year_hi, term)
+    return df_agg.groupby('Year')[DEPT_COLS].sum().reset_index()
+
+@st.cache_data(max_entries=CSV_CACHE_ENTRIES)
+def to_csv_bytes(year_lo, year_hi, term):
+    return filter_data(year_lo, year_hi, term).to_csv(index=False).encode('utf-8')
+
+@st.cache_data
+def load_years():
+    # np.sort sobre los valores únicos; se devuelve como lista de int para el slider
+    return np.sort(load_data()['Year'].unique()).tolist()
+
+@st.cache_data
+def global_baselines():
+    df = load_data()
+    return {
+        'retention': df['Retention Rate (%)'].mean(),
+        'satisfaction': df['Student Satisfaction (%)'].mean(),
+        'enrolled': df['Enrolled'].sum()
+    }
+
 df = load_data()
+baselines = global_baselines()
 
 # Sidebar con filtros mejorados
 st.sidebar.header("🔍 Panel de Filtros")
 st.sidebar.markdown("Selecciona los criterios para filtrar los datos:")
 
 # Filtro de rango de años con slider
-years = sorted(df['Year'].unique())
+years = load_years()
 year_range = st.sidebar.select_slider(
     "📅 Rango de Años",
     options=years,
@@ -52,12 +205,8 @@ dept_option = st.sidebar.selectbox(
 )
 
 # Aplicar filtros
-df_filtered = df[(df['Year'] >= year_range[0]) & (df['Year'] <= year_range[1])]
-
-if term_option == "Spring (Primavera)":
-    df_filtered = df_filtered[df_filtered['Term'] == 'Spring']
-elif term_option == "Fall (Otoño)":
-    df_filtered = df_filtered[df_filtered['Term'] == 'Fall']
+term = TERM_MAP.get(term_option)
+df_filtered = filter_data(year_range[0], year_range[1], term)
 
 # Información sobre los filtros aplicados
 st.sidebar.markdown("---")
@@ -69,43 +218,44 @@ if df_filtered.empty:
     st.warning("⚠️ No hay datos disponibles para los filtros seleccionados. Por favor, ajusta tu selección.")
     st.stop()
 
+# Totales y promedios del período filtrado en una sola pasada por grupo de columnas
+totals = df_filtered[['Applications', 'Admitted', 'Enrolled']].sum()
+means = df_filtered[['Retention Rate (%)', 'Student Satisfaction (%)']].mean()
+
 # KPIs principales
 st.markdown("## 📈 Indicadores Clave de Desempeño (KPIs)")
 
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    avg_retention = df_filtered['Retention Rate (%)'].mean()
-    retention_change = avg_retention - df['Retention Rate (%)'].mean()
+    value, delta = kpi(means['Retention Rate (%)'], baselines['retention'], pct=True, fmt='.1f')
     st.metric(
         label="📊 Tasa de Retención Promedio",
-        value=f"{avg_retention:.1f}%",
-        delta=f"{retention_change:.1f}%"
+        value=value,
+        delta=delta
     )
     st.caption("Porcentaje de estudiantes que continúan sus estudios")
 
 with col2:
-    avg_satisfaction = df_filtered['Student Satisfaction (%)'].mean()
-    satisfaction_change = avg_satisfaction - df['Student Satisfaction (%)'].mean()
+    value, delta = kpi(means['Student Satisfaction (%)'], baselines['satisfaction'], pct=True, fmt='.1f')
     st.metric(
         label="😊 Satisfacción Estudiantil",
-        value=f"{avg_satisfaction:.1f}%",
-        delta=f"{satisfaction_change:.1f}%"
+        value=value,
+        delta=delta
     )
     st.caption("Nivel de satisfacción reportado por estudiantes")
 
 with col3:
-    total_enrolled = df_filtered['Enrolled'].sum()
-    enrolled_change = total_enrolled - df['Enrolled'].sum()
+    value, delta = kpi(totals['Enrolled'], baselines['enrolled'])
     st.metric(
         label="👥 Total Matriculados",
-        value=f"{total_enrolled:,}",
-        delta=f"{enrolled_change:,}"
+        value=value,
+        delta=delta
     )
     st.caption("Número total de estudiantes matriculados")
 
 with col4:
-    avg_admission_rate = (df_filtered['Admitted'].sum() / df_filtered['Applications'].sum() * 100)
+    avg_admission_rate = (totals['Admitted'] / totals['Applications'] * 100)
     st.metric(
         label="✅ Tasa de Admisión",
         value=f"{avg_admission_rate:.1f}%"
@@ -130,39 +280,29 @@ with st.expander("📖 Interpretación de los Indicadores", expanded=False):
     puede indicar mayor competitividad y prestigio.
     """)
 
-# Gráficos principales
-tab1, tab2, tab3, tab4 = st.tabs(["📈 Tendencias Temporales", "🆚 Comparación de Períodos", "🏢 Análisis por Departamento", "📊 Vista General"])
-
-with tab1:
+# Gráficos principales: cada pestaña es un fragmento que se re-ejecuta por separado
+@st.fragment
+def render_tab1(df_yearly):
     st.header("📈 Evolución Temporal de Indicadores Clave")
     
-    # Agrupar por año para tendencias
-    df_yearly = df_filtered.groupby('Year').agg({
-        'Retention Rate (%)': 'mean',
-        'Student Satisfaction (%)': 'mean',
-        'Enrolled': 'sum',
-        'Applications': 'sum',
-        'Admitted': 'sum'
-    }).reset_index()
-    
     # Gráfico de líneas doble
     st.subheader("🎯 Retención y Satisfacción a lo Largo del Tiempo")
     
     fig = make_subplots(specs=[[{"secondary_y": True}]])
     
     fig.add_trace(
-        go.Scatter(x=df_yearly['Year'], y=df_yearly['Retention Rate (%)'], 
-                   name="Tasa de Retención", mode='lines+markers',
-                   line=dict(color='#2E86AB', width=3),
-                   marker=dict(size=8)),
+        Scatter(x=df_yearly['Year'].to_numpy(), y=df_yearly['Retention Rate (%)'].to_numpy(dtype='float32'), 
+                name="Tasa de Retención", mode='lines+markers',
+                line=dict(color='#2E86AB', width=3),
+                marker=dict(size=8)),
         secondary_y=False
     )
     
     fig.add_trace(
-        go.Scatter(x=df_yearly['Year'], y=df_yearly['Student Satisfaction (%)'], 
-                   name="Satisfacción Estudiantil", mode='lines+markers',
-                   line=dict(color='#A23B72', width=3),
-                   marker=dict(size=8)),
+        Scatter(x=df_yearly['Year'].to_numpy(), y=df_yearly['Student Satisfaction (%)'].to_numpy(dtype='float32'), 
+                name="Satisfacción Estudiantil", mode='lines+markers',
+                line=dict(color='#A23B72', width=3),
+                marker=dict(size=8)),
         secondary_y=False
     )
     
@@ -186,13 +326,15 @@ with tab1:
     
     # Gráfico de enrollment
     st.subheader("👥 Evolución de la Matrícula Estudiantil")
-    fig2 = px.area(df_yearly, x='Year', y='Enrolled', 
-                   title='Total de Estudiantes Matriculados por Año')
-    fig2.update_traces(line_color='#F18F01', fillcolor='rgba(241, 143, 1, 0.3)')
-    fig2.update_layout(height=400)
-    fig2.update_xaxes(title_text="Año")
-    fig2.update_yaxes(title_text="Número de Estudiantes")
-    st.plotly_chart(fig2, use_container_width=True)
+    # Área en Altair/Vega-Lite: solo se envían las filas anuales ya agregadas
+    chart2 = alt.Chart(df_yearly, title='Total de Estudiantes Matriculados por Año').mark_area(
+        color='#F18F01', fillOpacity=0.3, line=True
+    ).encode(
+        x=alt.X('Year:O', title='Año', axis=alt.Axis(labelAngle=0)),
+        y=alt.Y('Enrolled:Q', title='Número de Estudiantes'),
+        tooltip=[alt.Tooltip('Year:O', title='Año'), alt.Tooltip('Enrolled:Q', title='Matriculados', format=',')]
+    ).properties(height=400)
+    st.altair_chart(chart2, use_container_width=True)
     
     st.markdown("""
     **💡 Interpretación:** El gráfico de matrícula muestra un **crecimiento sostenido** en el número 
@@ -206,15 +348,15 @@ with tab1:
     
     with col1:
         fig3 = go.Figure()
-        fig3.add_trace(go.Scatter(x=df_yearly['Year'], y=df_yearly['Applications'], 
-                                  name='Aplicaciones', mode='lines+markers',
-                                  line=dict(color='#06A77D', width=2)))
-        fig3.add_trace(go.Scatter(x=df_yearly['Year'], y=df_yearly['Admitted'], 
-                                  name='Admitidos', mode='lines+markers',
-                                  line=dict(color='#D62839', width=2)))
-        fig3.add_trace(go.Scatter(x=df_yearly['Year'], y=df_yearly['Enrolled'], 
-                                  name='Matriculados', mode='lines+markers',
-                                  line=dict(color='#F77F00', width=2)))
+        fig3.add_trace(Scatter(x=df_yearly['Year'].to_numpy(), y=df_yearly['Applications'].to_numpy(), 
+                               name='Aplicaciones', mode='lines+markers',
+                               line=dict(color='#06A77D', width=2)))
+        fig3.add_trace(Scatter(x=df_yearly['Year'].to_numpy(), y=df_yearly['Admitted'].to_numpy(), 
+                               name='Admitidos', mode='lines+markers',
+                               line=dict(color='#D62839', width=2)))
+        fig3.add_trace(Scatter(x=df_yearly['Year'].to_numpy(), y=df_yearly['Enrolled'].to_numpy(), 
+                               name='Matriculados', mode='lines+markers',
+                               line=dict(color='#F77F00', width=2)))
         fig3.update_layout(title='Aplicaciones → Admisiones → Matrícula', height=400)
         fig3.update_xaxes(title_text="Año")
         fig3.update_yaxes(title_text="Número de Estudiantes")
@@ -235,19 +377,11 @@ with tab1:
         - Capacidad institucional bien gestionada
         """)
 
-with tab2:
+@st.fragment
+def render_tab2(df_term):
     st.header("🆚 Comparación entre Períodos Académicos")
     st.markdown("Análisis comparativo entre los períodos de **Spring (Primavera)** y **Fall (Otoño)**")
     
-    # Comparación por término
-    df_term = df_filtered.groupby('Term').agg({
-        'Retention Rate (%)': 'mean',
-        'Student Satisfaction (%)': 'mean',
-        'Enrolled': 'sum',
-        'Applications': 'sum',
-        'Admitted': 'sum'
-    }).reset_index()
-    
     col1, col2 = st.columns(2)
     
     with col1:
@@ -299,23 +433,10 @@ with tab2:
     else:
         st.info("Selecciona 'Todos' los períodos en el filtro para ver la comparación completa.")
 
-with tab3:
+@st.fragment
+def render_tab3(dept_data, df_dept_trend):
     st.header("🏢 Análisis de Matrícula por Departamento")
     
-    # Preparar datos por departamento
-    dept_data = pd.DataFrame({
-        'Departamento': ['Ingeniería', 'Negocios', 'Artes', 'Ciencias'],
-        'Total Matriculados': [
-            df_filtered['Engineering Enrolled'].sum(),
-            df_filtered['Business Enrolled'].sum(),
-            df_filtered['Arts Enrolled'].sum(),
-            df_filtered['Science Enrolled'].sum()
-        ]
-    })
-    
-    # Calcular porcentajes
-    dept_data['Porcentaje'] = (dept_data['Total Matriculados'] / dept_data['Total Matriculados'].sum() * 100).round(1)
-    
     col1, col2 = st.columns(2)
     
     with col1:
@@ -341,30 +462,24 @@ with tab3:
     
     # Tabla de datos
     st.subheader("📋 Tabla Resumen por Departamento")
-    dept_data_display = dept_data.copy()
-    dept_data_display['Porcentaje'] = dept_data_display['Porcentaje'].astype(str) + '%'
-    st.dataframe(dept_data_display, use_container_width=True, hide_index=True)
+    st.dataframe(dept_data, use_container_width=True, hide_index=True,
+                 column_order=['Departamento', 'Total Matriculados', 'Pct_Display'],
+                 column_config={'Pct_Display': 'Porcentaje'})
     
     st.markdown("---")
     
     # Tendencias por departamento
     st.subheader("📈 Evolución de Matrícula por Departamento")
-    df_dept_trend = df_filtered.groupby('Year').agg({
-        'Engineering Enrolled': 'sum',
-        'Business Enrolled': 'sum',
-        'Arts Enrolled': 'sum',
-        'Science Enrolled': 'sum'
-    }).reset_index()
     
     fig7 = go.Figure()
-    fig7.add_trace(go.Scatter(x=df_dept_trend['Year'], y=df_dept_trend['Engineering Enrolled'], 
-                              name='Ingeniería', mode='lines+markers', line=dict(width=3)))
-    fig7.add_trace(go.Scatter(x=df_dept_trend['Year'], y=df_dept_trend['Business Enrolled'], 
-                              name='Negocios', mode='lines+markers', line=dict(width=3)))
-    fig7.add_trace(go.Scatter(x=df_dept_trend['Year'], y=df_dept_trend['Arts Enrolled'], 
-                              name='Artes', mode='lines+markers', line=dict(width=3)))
-    fig7.add_trace(go.Scatter(x=df_dept_trend['Year'], y=df_dept_trend['Science Enrolled'], 
-                              name='Ciencias', mode='lines+markers', line=dict(width=3)))
+    fig7.add_trace(Scatter(x=df_dept_trend['Year'].to_numpy(), y=df_dept_trend['Engineering Enrolled'].to_numpy(), 
+                           name='Ingeniería', mode='lines+markers', line=dict(width=3)))
+    fig7.add_trace(Scatter(x=df_dept_trend['Year'].to_numpy(), y=df_dept_trend['Business Enrolled'].to_numpy(), 
+                           name='Negocios', mode='lines+markers', line=dict(width=3)))
+    fig7.add_trace(Scatter(x=df_dept_trend['Year'].to_numpy(), y=df_dept_trend['Arts Enrolled'].to_numpy(), 
+                           name='Artes', mode='lines+markers', line=dict(width=3)))
+    fig7.add_trace(Scatter(x=df_dept_trend['Year'].to_numpy(), y=df_dept_trend['Science Enrolled'].to_numpy(), 
+                           name='Ciencias', mode='lines+markers', line=dict(width=3)))
     fig7.update_layout(height=450, hovermode='x unified')
     fig7.update_xaxes(title_text="Año")
     fig7.update_yaxes(title_text="Número de Estudiantes")
@@ -374,14 +489,15 @@ with tab3:
     st.markdown("### 💡 Análisis por Departamento")
     
     # Encontrar el departamento más grande
-    max_dept = dept_data.loc[dept_data['Total Matriculados'].idxmax()]
-    min_dept = dept_data.loc[dept_data['Total Matriculados'].idxmin()]
+    dept_totals = dept_data['Total Matriculados'].to_numpy()
+    max_dept = dept_data.iloc[dept_totals.argmax()]
+    min_dept = dept_data.iloc[dept_totals.argmin()]
     
     st.markdown(f"""
     **Hallazgos Principales:**
     
-    - **{max_dept['Departamento']}** lidera con **{max_dept['Total Matriculados']:,}** estudiantes ({max_dept['Porcentaje']}%)
-    - **{min_dept['Departamento']}** tiene la menor matrícula con **{min_dept['Total Matriculados']:,}** estudiantes ({min_dept['Porcentaje']}%)
+    - **{max_dept['Departamento']}** lidera con **{max_dept['Total Matriculados']:,}** estudiantes ({max_dept['Pct_Display']})
+    - **{min_dept['Departamento']}** tiene la menor matrícula con **{min_dept['Total Matriculados']:,}** estudiantes ({min_dept['Pct_Display']})
     - Todos los departamentos muestran **tendencias de crecimiento** positivas
     - La diversificación departamental indica una **oferta académica equilibrada**
     
@@ -389,9 +505,12 @@ with tab3:
     mientras se fortalecen programas de menor matrícula para mantener la diversidad académica.
     """)
 
-with tab4:
+@st.fragment
+def render_tab4(df_filtered, df_yearly, dept_data, totals, means, year_range, term):
     st.header("📊 Vista General y Resumen Ejecutivo")
     
+    top_dept = dept_data.iloc[dept_data['Total Matriculados'].to_numpy().argmax()]
+    
     # Estadísticas generales
     st.subheader("📈 Estadísticas Resumidas del Período Seleccionado")
     
@@ -399,20 +518,20 @@ with tab4:
     
     with col1:
         st.markdown("### 📝 Aplicaciones")
-        total_apps = df_filtered['Applications'].sum()
+        total_apps = totals['Applications']
         st.metric("Total de Aplicaciones", f"{total_apps:,}")
-        st.caption(f"Promedio por registro: {df_filtered['Applications'].mean():.0f}")
+        st.caption(f"Promedio por registro: {total_apps / len(df_filtered):.0f}")
     
     with col2:
         st.markdown("### ✅ Admitidos")
-        total_admitted = df_filtered['Admitted'].sum()
+        total_admitted = totals['Admitted']
         admission_rate = (total_admitted / total_apps * 100) if total_apps > 0 else 0
         st.metric("Total Admitidos", f"{total_admitted:,}")
         st.caption(f"Tasa de admisión: {admission_rate:.1f}%")
     
     with col3:
         st.markdown("### 🎓 Matriculados")
-        total_enrolled = df_filtered['Enrolled'].sum()
+        total_enrolled = totals['Enrolled']
         yield_rate = (total_enrolled / total_admitted * 100) if total_admitted > 0 else 0
         st.metric("Total Matriculados", f"{total_enrolled:,}")
         st.caption(f"Tasa de rendimiento: {yield_rate:.1f}%")
@@ -426,11 +545,7 @@ with tab4:
     with col1:
         funnel_data = pd.DataFrame({
             'Etapa': ['Aplicaciones Recibidas', 'Estudiantes Admitidos', 'Estudiantes Matriculados'],
-            'Cantidad': [
-                df_filtered['Applications'].sum(),
-                df_filtered['Admitted'].sum(),
-                df_filtered['Enrolled'].sum()
-            ]
+            'Cantidad': totals[['Applications', 'Admitted', 'Enrolled']].values
         })
         fig8 = px.funnel(funnel_data, x='Cantidad', y='Etapa', 
                          title='Del Interés a la Matrícula',
@@ -450,21 +565,26 @@ with tab4:
     # Resumen ejecutivo
     st.subheader("📋 Resumen Ejecutivo")
     
+    # Tendencias a partir de la agregación anual compartida con la pestaña 1
+    enrolled_up = df_yearly['Enrolled'].is_monotonic_increasing
+    retention_up = df_yearly['Retention Rate (%)'].is_monotonic_increasing
+    satisfaction_up = df_yearly['Student Satisfaction (%)'].is_monotonic_increasing
+    
     st.markdown(f"""
     ### Análisis del Período {year_range[0]} - {year_range[1]}
     
     **Indicadores Generales:**
-    - **Retención Promedio:** {df_filtered['Retention Rate (%)'].mean():.1f}% 
-    - **Satisfacción Promedio:** {df_filtered['Student Satisfaction (%)'].mean():.1f}%
-    - **Total de Estudiantes Matriculados:** {df_filtered['Enrolled'].sum():,}
+    - **Retención Promedio:** {means['Retention Rate (%)']:.1f}% 
+    - **Satisfacción Promedio:** {means['Student Satisfaction (%)']:.1f}%
+    - **Total de Estudiantes Matriculados:** {totals['Enrolled']:,}
     
     **Tendencias Observadas:**
-    - {'📈 Crecimiento' if df_filtered.groupby('Year')['Enrolled'].sum().is_monotonic_increasing else '📉 Variación'} en la matrícula estudiantil
-    - {'✅ Mejora continua' if df_filtered.groupby('Year')['Retention Rate (%)'].mean().is_monotonic_increasing else '⚠️ Fluctuación'} en tasas de retención
-    - {'😊 Aumento sostenido' if df_filtered.groupby('Year')['Student Satisfaction (%)'].mean().is_monotonic_increasing else '⚡ Cambios'} en satisfacción estudiantil
+    - {'📈 Crecimiento' if enrolled_up else '📉 Variación'} en la matrícula estudiantil
+    - {'✅ Mejora continua' if retention_up else '⚠️ Fluctuación'} en tasas de retención
+    - {'😊 Aumento sostenido' if satisfaction_up else '⚡ Cambios'} en satisfacción estudiantil
     
-    **Departamento Destacado:** {dept_data.loc[dept_data['Total Matriculados'].idxmax(), 'Departamento']} 
-    con {dept_data['Total Matriculados'].max():,} estudiantes
+    **Departamento Destacado:** {top_dept['Departamento']} 
+    con {top_dept['Total Matriculados']:,} estudiantes
     """)
     
     st.markdown("---")
@@ -472,10 +592,12 @@ with tab4:
     # Datos sin procesar
     st.subheader("🗂️ Datos Filtrados (Vista Detallada)")
     st.markdown(f"Mostrando **{len(df_filtered)}** registros basados en los filtros seleccionados:")
-    st.dataframe(df_filtered, use_container_width=True, height=400)
+    st.dataframe(df_filtered.head(PREVIEW_ROWS), use_container_width=True, height=400)
+    if len(df_filtered) > PREVIEW_ROWS:
+        st.caption(f"Mostrando primeras {PREVIEW_ROWS:,} de {len(df_filtered):,} filas; descarga completa abajo.")
     
     # Opción de descarga
-    csv = df_filtered.to_csv(index=False).encode('utf-8')
+    csv = to_csv_bytes(year_range[0], year_range[1], term)
     st.download_button(
         label="📥 Descargar datos filtrados como CSV",
         data=csv,
@@ -483,6 +605,27 @@ with tab4:
         mime='text/csv',
     )
 
+# Agregaciones compartidas entre pestañas: por año, por período, por departamento
+# y su evolución anual
+df_yearly = yearly_agg(year_range[0], year_range[1], term)
+df_term = term_agg(year_range[0], year_range[1], term)
+dept_data = dept_summary(year_range[0], year_range[1], term)
+df_dept_trend = dept_yearly_trend(year_range[0], year_range[1], term)
+
+tab1, tab2, tab3, tab4 = st.tabs(["📈 Tendencias Temporales", "🆚 Comparación de Períodos", "🏢 Análisis por Departamento", "📊 Vista General"])
+
+with tab1:
+    render_tab1(df_yearly)
+
+with tab2:
+    render_tab2(df_term)
+
+with tab3:
+    render_tab3(dept_data, df_dept_trend)
+
+with tab4:
+    render_tab4(df_filtered, df_yearly, dept_data, totals, means, year_range, term)
+
 # Footer
 st.markdown("---")
 st.markdown("**Universidad de la Costa** | Curso de Minería de Datos | 2025")